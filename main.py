@@ -1,14 +1,24 @@
 #!/usr/bin/env python3
 
 import sys
+import os
+import mmap
+import stat
 import argparse
 import yaml
+try:
+    from yaml import CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeDumper as _Dumper
 from pathlib import Path
-from lark import Lark, Transformer, Token
+from functools import lru_cache
+from lark import Lark, Token
 from lark.exceptions import LarkError
 import math
 import re
 
+_BLOCK_COMMENT_RE = re.compile(r'#\|.*?\|#', re.DOTALL)
+
 grammar = r"""
     start: (const_decl | dict)*
     
@@ -24,11 +34,11 @@ grammar = r"""
     array: "(" "list" array_items ")"
     array_items: array_value*
     
-    array_value: NUMBER | ESCAPED_STRING | BOOL
+    ?array_value: NUMBER | ESCAPED_STRING | BOOL
     
-    value: simple_value | array | dict | const_expr | NAME
+    ?value: simple_value | array | dict | const_expr | NAME
     
-    simple_value: NUMBER | STRING | BOOL
+    ?simple_value: NUMBER | STRING | BOOL
     
     NAME: /[a-zA-Z]+/
     NUMBER: /[0-9]+/
@@ -37,17 +47,118 @@ grammar = r"""
     BOOL: "true" | "false"
     OPERATION: "+" | "-" | "*" | "/" | "sqrt" | "len"
     
-    SINGLE_COMMENT: "//" /[^\n]*/
-    
-    %import common.WS
-    %ignore WS
-    %ignore SINGLE_COMMENT
+    %ignore /(?:[ \t\f\r\n]+|\/\/[^\n]*)+/
 """
 
-class MyTransformer(Transformer):
+_FUNC_NAMES = frozenset({'sqrt', 'len'})
+_BOOL_NAMES = frozenset({'true', 'false'})
+
+def _op_add(stack):
+    if len(stack) < 2:
+        raise ValueError("Мало аргументов для +")
+    b = stack.pop()
+    a = stack.pop()
+    ta, tb = type(a), type(b)
+    if ta is int and tb is int:
+        stack.append(a + b)
+    elif ta is str and tb is str:
+        stack.append(a + b)
+    elif ta is str:
+        stack.append(a + str(b))
+    elif tb is str:
+        stack.append(str(a) + b)
+    else:
+        stack.append(a + b)
+
+def _op_sub(stack):
+    if len(stack) < 2:
+        raise ValueError("Мало аргументов для -")
+    b = stack.pop()
+    a = stack.pop()
+    stack.append(a - b)
+
+def _op_mul(stack):
+    if len(stack) < 2:
+        raise ValueError("Мало аргументов для *")
+    b = stack.pop()
+    a = stack.pop()
+    stack.append(a * b)
+
+def _op_div(stack):
+    if len(stack) < 2:
+        raise ValueError("Мало аргументов для /")
+    b = stack.pop()
+    a = stack.pop()
+    if b == 0:
+        raise ValueError("Деление на ноль")
+    stack.append(a / b)
+
+def _op_sqrt(stack):
+    if not stack:
+        raise ValueError("Мало аргументов для sqrt")
+    a = stack.pop()
+    if a < 0:
+        raise ValueError("Корень из отрицательного")
+    stack.append(math.sqrt(a))
+
+def _op_len(stack):
+    if not stack:
+        raise ValueError("Мало аргументов для len")
+    a = stack.pop()
+    if isinstance(a, (list, dict, str)):
+        stack.append(len(a))
+    else:
+        raise ValueError(f"len нельзя применить к {type(a).__name__}")
+
+_OPS = {
+    '+': _op_add,
+    '-': _op_sub,
+    '*': _op_mul,
+    '/': _op_div,
+    'sqrt': _op_sqrt,
+    'len': _op_len,
+}
+
+class MyTransformer:
     def __init__(self):
-        super().__init__()
         self.consts = {}
+        self.rules = {
+            'start': self.start,
+            'dict': self.dict,
+            'dict_items': self.dict_items,
+            'dict_item': self.dict_item,
+            'array': self.array,
+            'array_items': self.array_items,
+            'const_decl': self.const_decl,
+            'const_expr': self.const_expr,
+            'expr_items': self.expr_items,
+        }
+        self.terminals = {
+            'NUMBER': self.NUMBER,
+            'STRING': self.STRING,
+            'ESCAPED_STRING': self.ESCAPED_STRING,
+            'BOOL': self.BOOL,
+        }
+    
+    def transform(self, tree):
+        rules = self.rules
+        terminals = self.terminals
+        stack = [(tree, iter(tree.children), [])]
+        while True:
+            node, children, items = stack[-1]
+            for c in children:
+                if isinstance(c, Token):
+                    f = terminals.get(c.type)
+                    items.append(f(c) if f else c)
+                else:
+                    stack.append((c, iter(c.children), []))
+                    break
+            else:
+                stack.pop()
+                res = rules[node.data](items)
+                if not stack:
+                    return res
+                stack[-1][2].append(res)
     
     def start(self, items):
         res = {}
@@ -57,9 +168,7 @@ class MyTransformer(Transformer):
         return res
     
     def dict(self, items):
-        if items and items[0] is not None:
-            return items[0]
-        return {}
+        return items[0] if items else {}
     
     def dict_items(self, items):
         res = {}
@@ -71,27 +180,19 @@ class MyTransformer(Transformer):
     
     def dict_item(self, items):
         if len(items) >= 2:
-            return (str(items[0]), items[1])
+            return (str(items[0]), self._resolve(items[1]))
         return None
     
     def array(self, items):
-        lst = []
-        for i in items:
-            if isinstance(i, list):
-                lst = i
-                break
-        return lst
+        return items[0] if items else []
     
     def array_items(self, items):
         return list(items)
     
-    def array_value(self, items):
-        return items[0] if items else None
-    
     def const_decl(self, items):
         if len(items) >= 2:
             name = str(items[0])
-            val = items[1]
+            val = self._resolve(items[1])
             self.consts[name] = val
         return {}
     
@@ -103,20 +204,22 @@ class MyTransformer(Transformer):
     def expr_items(self, items):
         return [i for i in items if i is not None]
     
-    def _calc(self, items):
+    def _calc(self, items, _Token=Token, _isinstance=isinstance):
         stack = []
+        consts = self.consts
         for i in items:
-            if isinstance(i, Token) and i.type == 'NAME':
+            t = i.type if _isinstance(i, _Token) else None
+            if t == 'NAME':
                 n = str(i)
-                if n in self.consts:
-                    stack.append(self.consts[n])
-                elif n in ['sqrt', 'len']:
-                    self._apply_op(n, stack)
+                if n in consts:
+                    stack.append(consts[n])
+                elif n in _FUNC_NAMES:
+                    _OPS[n](stack)
                 else:
                     raise ValueError(f"Константа не найдена: {n}")
             
-            elif isinstance(i, Token) and i.type == 'OPERATION':
-                self._apply_op(str(i), stack)
+            elif t == 'OPERATION':
+                _OPS[str(i)](stack)
             
             else:
                 stack.append(i)
@@ -125,74 +228,20 @@ class MyTransformer(Transformer):
             raise ValueError(f"Ошибка в выражении: {stack}")
         return stack[0]
     
-    def _apply_op(self, op, stack):
-        if op in ('+', '-', '*', '/'):
-            if len(stack) < 2:
-                raise ValueError(f"Мало аргументов для {op}")
-            b = stack.pop()
-            a = stack.pop()
-            
-            if op == '+':
-                if isinstance(a, str) or isinstance(b, str):
-                    stack.append(str(a) + str(b))
-                else:
-                    stack.append(a + b)
-            elif op == '-':
-                stack.append(a - b)
-            elif op == '*':
-                if isinstance(a, str) and isinstance(b, int):
-                    stack.append(a * b)
-                elif isinstance(a, int) and isinstance(b, str):
-                    stack.append(b * a)
-                else:
-                    stack.append(a * b)
-            elif op == '/':
-                if b == 0:
-                    raise ValueError("Деление на ноль")
-                stack.append(a / b)
-        
-        elif op == 'sqrt':
-            if not stack:
-                raise ValueError("Мало аргументов для sqrt")
-            a = stack.pop()
-            if a < 0:
-                raise ValueError("Корень из отрицательного")
-            stack.append(math.sqrt(a))
-        
-        elif op == 'len':
-            if not stack:
-                raise ValueError("Мало аргументов для len")
-            a = stack.pop()
-            if isinstance(a, (list, dict, str)):
-                stack.append(len(a))
-            else:
-                raise ValueError(f"len нельзя применить к {type(a).__name__}")
-    
-    def value(self, items):
-        if not items:
-            return None
-            
-        i = items[0]
-        
+    def _resolve(self, i):
         if isinstance(i, Token) and i.type == 'NAME':
             n = str(i)
             
             if n in self.consts:
                 return self.consts[n]
             
-            if n in ('true', 'false'):
+            if n in _BOOL_NAMES:
                 return self.BOOL(i)
             
             raise ValueError(f"Неизвестная константа {n}")
 
         return i
     
-    def simple_value(self, items):
-        return items[0] if items else None
-    
-    def NAME(self, token):
-        return Token('NAME', str(token))
-    
     def NUMBER(self, token):
         return int(token)
     
@@ -204,19 +253,38 @@ class MyTransformer(Transformer):
     
     def BOOL(self, token):
         return str(token) == 'true'
-    
-    def OPERATION(self, token):
-        return Token('OPERATION', str(token))
+
+_PARSER = Lark(grammar, parser='lalr', cache=True)
+
+_PARSE_CACHE_MAX_TEXT = 16 * 1024
+
+def _parse(text):
+    if '#|' in text:
+        text = _BLOCK_COMMENT_RE.sub('', text)
+    return _PARSER.parse(text)
+
+_parse_cached = lru_cache(maxsize=16)(_parse)
+
+def _parse_tree(text):
+    if len(text) <= _PARSE_CACHE_MAX_TEXT:
+        return _parse_cached(text)
+    return _parse(text)
 
 class Converter:
     def __init__(self):
         self.trans = MyTransformer()
-        self.parser = Lark(grammar, parser='lalr', transformer=self.trans)
     
     def parse_file(self, path):
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = f.read()
+            with open(path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if stat.S_ISREG(st.st_mode) and st.st_size:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        data = str(mm, 'utf-8')
+                else:
+                    data = f.read().decode('utf-8')
+            if '\r' in data:
+                data = data.replace('\r\n', '\n').replace('\r', '\n')
             return self.parse_content(data)
         except FileNotFoundError:
             raise ValueError(f"Нет файла: {path}")
@@ -224,17 +292,19 @@ class Converter:
             raise ValueError(f"Ошибка чтения: {e}")
     
     def parse_content(self, text):
-        text = re.sub(r'#\|.*?\|#', '', text, flags=re.DOTALL)
         try:
-            res = self.parser.parse(text)
+            tree = _parse_tree(text)
+            res = self.trans.transform(tree)
             return res if res is not None else {}
         except LarkError as e:
             raise ValueError(f"Ошибка синтаксиса: {e}")
         except ValueError as e:
             raise ValueError(f"Ошибка вычисления: {e}")
     
-    def to_yaml(self, cfg):
-        return yaml.dump(cfg, allow_unicode=True, default_flow_style=False, sort_keys=False)
+    def dump_yaml(self, cfg, stream=None):
+        if stream is None:
+            stream = sys.stdout
+        yaml.dump(cfg, stream, Dumper=_Dumper, allow_unicode=True, default_flow_style=False, sort_keys=False)
 
 def main():
     parser = argparse.ArgumentParser(description='Конвертер конфигов в YAML')
@@ -244,7 +314,7 @@ def main():
     try:
         conv = Converter()
         cfg = conv.parse_file(Path(args.input))
-        print(conv.to_yaml(cfg))
+        conv.dump_yaml(cfg)
         return 0
     except Exception as e:
         print(f"Ошибка: {e}", file=sys.stderr)
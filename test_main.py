@@ -0,0 +1,178 @@
+import math
+import os
+import tempfile
+import threading
+import unittest
+
+from main import Converter
+
+PRELUDE = """
+global n = 10;
+global s = 'ab';
+global f = ^{1 2 /};
+global t = true;
+global L = (list 1 2 3);
+global D = [k => 1];
+"""
+
+
+class TestConverter(unittest.TestCase):
+    def setUp(self):
+        self.conv = Converter()
+
+    def calc(self, expr):
+        return self.conv.parse_content(PRELUDE + f"[x => ^{{{expr}}}]")['x']
+
+    def assertCalc(self, expr, expected):
+        res = self.calc(expr)
+        self.assertEqual(res, expected)
+        self.assertIs(type(res), type(expected))
+
+    def assertCalcError(self, expr, msg):
+        with self.assertRaises(ValueError) as cm:
+            self.calc(expr)
+        self.assertEqual(str(cm.exception), f"Ошибка вычисления: {msg}")
+
+    def test_add(self):
+        self.assertCalc("1 2 +", 3)
+        self.assertCalc("'a' 'b' +", 'ab')
+        self.assertCalc("'a' 2 +", 'a2')
+        self.assertCalc("2 'a' +", '2a')
+        self.assertCalc("t 1 +", 2)
+        self.assertCalc("t 'x' +", 'Truex')
+        self.assertCalc("f 1 +", 1.5)
+        self.assertCalc("f 'x' +", '0.5x')
+        self.assertCalc("L len 'x' +", '3x')
+
+    def test_sub(self):
+        self.assertCalc("5 3 -", 2)
+        self.assertCalc("f 1 -", -0.5)
+
+    def test_mul(self):
+        self.assertCalc("2 3 *", 6)
+        self.assertCalc("s 3 *", 'ababab')
+        self.assertCalc("3 s *", 'ababab')
+        self.assertCalc("f 4 *", 2.0)
+        self.assertCalc("t s *", 'ab')
+
+    def test_div(self):
+        self.assertCalc("7 2 /", 3.5)
+        self.assertCalc("4 2 /", 2.0)
+
+    def test_negative_zero(self):
+        res = self.conv.parse_content(
+            "global pz = ^{0 1 /}; global nz = ^{0 0 1 - /};"
+            "[a => ^{pz}, b => ^{nz}]")
+        self.assertEqual(math.copysign(1, res['a']), 1.0)
+        self.assertEqual(math.copysign(1, res['b']), -1.0)
+
+    def test_functions(self):
+        self.assertCalc("16 sqrt", 4.0)
+        self.assertCalc("2 sqrt", math.sqrt(2))
+        self.assertCalc("s len", 2)
+        self.assertCalc("L len", 3)
+        self.assertCalc("D len", 1)
+        self.assertCalc("n 2 * 6 - sqrt", math.sqrt(14))
+
+    def test_const_reference(self):
+        self.assertCalc("n", 10)
+
+    def test_arity_errors(self):
+        for op in ('+', '-', '*', '/', 'sqrt', 'len'):
+            self.assertCalcError(op, f"Мало аргументов для {op}")
+        self.assertCalcError("1 +", "Мало аргументов для +")
+        self.assertCalcError("+ 5 1 0 /", "Мало аргументов для +")
+
+    def test_value_errors(self):
+        self.assertCalcError("1 0 /", "Деление на ноль")
+        self.assertCalcError("1 2 - sqrt", "Корень из отрицательного")
+        self.assertCalcError("5 len", "len нельзя применить к int")
+        self.assertCalcError("f len", "len нельзя применить к float")
+        self.assertCalcError("q", "Константа не найдена: q")
+        self.assertCalcError("1 2", "Ошибка в выражении: [1, 2]")
+        self.assertCalcError("", "Ошибка в выражении: []")
+
+    def test_deeply_nested_dict(self):
+        depth = 1000
+        res = self.conv.parse_content("[a => " * depth + "1" + "]" * depth)
+        for _ in range(depth):
+            res = res['a']
+        self.assertEqual(res, 1)
+
+    def test_line_comments_and_whitespace(self):
+        self.assertEqual(self.conv.parse_content("[a => 1] // конец"), {'a': 1})
+        self.assertEqual(
+            self.conv.parse_content("// начало\n[a => 1, // x\n b => 2]// eof"),
+            {'a': 1, 'b': 2})
+        self.assertEqual(
+            self.conv.parse_content("  \t\n// c1\n\n  // c2\n\t[a => 1]\r\n\f//"),
+            {'a': 1})
+
+    def test_comment_marker_inside_string(self):
+        self.assertEqual(self.conv.parse_content("[a => '//x']"), {'a': '//x'})
+
+    def test_non_ascii_whitespace_rejected(self):
+        for text in ("[a\xa0=> 1]", "[a => 1,\x0bb => 2]", "[a => 1] "):
+            with self.assertRaises(ValueError) as cm:
+                self.conv.parse_content(text)
+            self.assertTrue(str(cm.exception).startswith("Ошибка синтаксиса"))
+
+    def test_block_comments(self):
+        self.assertEqual(
+            self.conv.parse_content("#| много\nстрок [z => 9] |#\n[a => 1]"),
+            {'a': 1})
+        self.assertEqual(
+            self.conv.parse_content("#| a |# [a => 1] #| b\n |#"), {'a': 1})
+
+    def test_unclosed_block_comment(self):
+        with self.assertRaises(ValueError) as cm:
+            self.conv.parse_content("[a => 1] #|")
+        self.assertTrue(str(cm.exception).startswith("Ошибка синтаксиса"))
+
+    def test_cached_parse_registers_globals(self):
+        text = "global g = 3; #| c |# [a => ^{g 1 +}]"
+        self.assertEqual(Converter().parse_content(text), {'a': 4})
+        conv = Converter()
+        self.assertEqual(conv.parse_content(text), {'a': 4})
+        self.assertEqual(conv.parse_content("[b => g]"), {'b': 3})
+
+    def write_conf(self, data):
+        fd, path = tempfile.mkstemp(suffix='.conf')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_parse_file_crlf(self):
+        path = self.write_conf(b"[x => 'a\r\nb', y => 1]\r\n")
+        self.assertEqual(self.conv.parse_file(path), {'x': 'a\nb', 'y': 1})
+
+    def test_parse_file_empty(self):
+        self.assertEqual(self.conv.parse_file(self.write_conf(b"")), {})
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), "нужен mkfifo")
+    def test_parse_file_fifo(self):
+        d = tempfile.mkdtemp()
+        path = os.path.join(d, 'in.conf')
+        os.mkfifo(path)
+        self.addCleanup(os.rmdir, d)
+        self.addCleanup(os.remove, path)
+
+        def writer():
+            with open(path, 'wb') as f:
+                f.write("[x => ^{2 3 *}]".encode('utf-8'))
+
+        th = threading.Thread(target=writer)
+        th.start()
+        res = self.conv.parse_file(path)
+        th.join()
+        self.assertEqual(res, {'x': 6})
+
+    def test_type_errors(self):
+        for expr in ("'s' 1 -", "s 1 -", "'s' 1 - 1 0 /"):
+            with self.assertRaises(TypeError):
+                self.calc(expr)
+
+
+if __name__ == '__main__':
+    unittest.main()